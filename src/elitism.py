@@ -1,9 +1,40 @@
 from deap import tools
-from deap import algorithms
-import re
+import random
+
+import numpy as np
+
+
+def varAndBatch(population, toolbox, cxpb, mutpb, rng=random):
+    """This is DEAP varAnd() with the per-individual mutation loop replaced by a single call to
+    toolbox.batchMutate(offspring, mutpb), which mutates the whole offspring at once and
+    returns a boolean mask of the mutated individuals. Crossover is applied pairwise as in varAnd().
+    Fitness values are invalidated once at the end, only for individuals changed by either operator.
+    Crossover decisions are drawn from rng (a random.Random instance or the random module).
+    """
+    count = len(population)
+    offspring = [None] * count
+    dirty = np.zeros(count, dtype=bool)
+
+    # Clone the offspring and apply crossover on it in a single pass over the pairs
+    for i in range(1, count, 2):
+        ind1, ind2 = toolbox.clone(population[i - 1]), toolbox.clone(population[i])
+        if rng.random() < cxpb:
+            ind1, ind2 = toolbox.mate(ind1, ind2)
+            dirty[i - 1] = dirty[i] = True
+        offspring[i - 1], offspring[i] = ind1, ind2
+    if count % 2:
+        offspring[count - 1] = toolbox.clone(population[count - 1])
+
+    # Apply mutation on the offspring
+    dirty |= toolbox.batchMutate(offspring, mutpb)
+
+    for i in np.flatnonzero(dirty).tolist():
+        del offspring[i].fitness.values
+    return offspring
+
 
 def eaSimpleWithElitism(population, toolbox, cxpb, mutpb, ngen, stats=None,
-             halloffame=None, status_callback=None, stuck=(1e9, None), verbosity=1):
+             halloffame=None, status_callback=None, stuck=(1e9, None), verbosity=1, rng=random):
     """This algorithm is similar to DEAP eaSimple() algorithm, with the modification that
     halloffame is used to implement an elitism mechanism. The individuals contained in the
     halloffame are directly injected into the next generation and are not subject to the
@@ -27,11 +58,12 @@ def eaSimpleWithElitism(population, toolbox, cxpb, mutpb, ngen, stats=None,
     record = stats.compile(population) if stats else {}
     logbook.record(gen=0, nevals=len(invalid_ind), **record)
     if status_callback:
-        log = re.split('[\s]+', str(logbook.stream))
+        log = str(logbook.stream).split()
         status_callback(f"gen: {log[-4]}, best: {log[-2]}, mean: {log[-1]}")
 
     stuck_count = 0
     last_min = False
+    best_min = record.get('min')
 
     save_mutpb = mutpb
     radiation = 0
@@ -64,13 +96,15 @@ def eaSimpleWithElitism(population, toolbox, cxpb, mutpb, ngen, stats=None,
                 mutpb = 0.5
                 radiation = stuck[0]
                 shock_event='Radiation Leak'
+                # vary the current population without its hall of fame part
+                offspring = population[:len(population) - hof_size]
             stuck_count = 0
         else:
             # Use defined selection algorithm
             offspring = toolbox.select(population, len(population) - hof_size)
 
         # Vary the pool of individuals
-        offspring = algorithms.varAnd(offspring, toolbox, cxpb, mutpb)
+        offspring = varAndBatch(offspring, toolbox, cxpb, mutpb, rng=rng)
 
         # Evaluate the individuals with an invalid fitness
         invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
@@ -79,10 +113,12 @@ def eaSimpleWithElitism(population, toolbox, cxpb, mutpb, ngen, stats=None,
             ind.fitness.values = fit
 
         # add the best back to population:
+        n_offspring = len(offspring)
         offspring.extend(halloffame.items)
 
         # Update the hall of fame with the generated individuals
-        halloffame.update(offspring)
+        # (the injected hall of fame items are already members, so they are skipped)
+        halloffame.update(offspring[:n_offspring])
 
         # Replace the current population by the offspring
         population[:] = offspring
@@ -90,12 +126,15 @@ def eaSimpleWithElitism(population, toolbox, cxpb, mutpb, ngen, stats=None,
         # Append the current generation statistics to the logbook
         record = stats.compile(population) if stats else {}
         logbook.record(gen=gen, nevals=len(invalid_ind), **record, radiation=radiation, shock_event=shock_event)
-        log = re.split('[\s]+', str(logbook.stream))
         if status_callback and gen % verbosity == 0:
+            # the stream holds all lines since the last report, only the latest one is shown
+            log = str(logbook.stream).splitlines()[-1].split()
             status_callback(f"gen: {log[0]}, best: {log[2]}, mean: {log[3]}")
 
         # Check if minimum has changed vs previous iteration, else raise stuck_count
-        new_min = min(logbook.select('min'))
+        # (running minimum over all generations, avoids rescanning the logbook)
+        best_min = record['min'] if best_min is None else min(best_min, record['min'])
+        new_min = best_min
 
         if last_min:
             if new_min == last_min:
@@ -1,6 +1,7 @@
 from deap import base
 from deap import creator
 from deap import tools
+import array
 import random
 
 import numpy as np
@@ -8,6 +9,21 @@ import numpy as np
 import src.elitism as elitism
 import src.sudoku as sudoku
 
+# upper limit of cached fitness values per solver
+FITNESS_CACHE_SIZE = 200000
+
+
+class FitnessStatistics:
+    """Lightweight replacement for tools.Statistics, computing min and avg of the first fitness value.
+    Values are read into a single array with np.fromiter instead of a list of fitness tuples.
+    """
+    fields = ['min', 'avg']
+
+    def compile(self, population):
+        values = np.fromiter((ind.fitness.values[0] for ind in population), dtype=np.float64,
+                             count=len(population))
+        return {'min': values.min(), 'avg': values.mean()}
+
 
 class GASolver:
     """Defines and controls key parameters for genetic algorithm solution"""
@@ -24,6 +40,7 @@ class GASolver:
                  stuck_count=50,
                  verbosity=20,
                  random_seed=42,
+                 device=None,
                  status_callback=None,
                  final_callback=None
                  ):
@@ -38,12 +55,19 @@ class GASolver:
         self.status_callback = status_callback
         self.final_callback = final_callback
         self.solved = False
+        self.device = device
+        self._fit_cache = {}
 
-        random.seed(random_seed)
+        # solver-local random generators, the global random state is left untouched:
+        self.rng = random.Random(random_seed)
+        self.np_rng = np.random.default_rng(random_seed)
 
         # create the desired sudoku problem
         self.n_sudoku = sudoku.SudokuProblem(sudoku_grid, sudoku_possibilities)
 
+        # exclusive upper bounds per gene for vectorized sampling:
+        self.upper_bounds = np.asarray(self.n_sudoku.possibility_range, dtype=np.intc) + 1
+
         self.toolbox = base.Toolbox()
 
         # define a single objective, minimizing fitness strategy:
@@ -57,8 +81,8 @@ class GASolver:
 
         creator.create("FitnessMin", base.Fitness, weights=(-1.0,))
 
-        # create the Individual class based on list of lists:
-        creator.create("Individual", list, typecode='i', fitness=creator.FitnessMin)
+        # create the Individual class based on a compact array of C ints (one row index per sudoku row):
+        creator.create("Individual", array.array, typecode='i', fitness=creator.FitnessMin)
 
         # create an operator that generates randomly shuffled indices:
         self.toolbox.register("randomSudoku", self.random_sudoku)
@@ -71,26 +95,82 @@ class GASolver:
 
         self.toolbox.register("evaluate", self.get_violations_count)
 
-        self.toolbox.register("select", tools.selTournament, tournsize=2)
-        self.toolbox.register("mate", tools.cxOnePoint)  # , indpb=1.0 / self.n_sudoku.size)
-        self.toolbox.register("mutate", tools.mutUniformInt, low=0, up=self.n_sudoku.possibility_range,
-                              indpb=1.0 / self.n_sudoku.size)
+        # evaluate all invalid individuals of a generation in a single batch:
+        self.toolbox.register("map", self.batched_map)
+
+        self.toolbox.register("select", self.vec_tournament, tournsize=2)
+        self.toolbox.register("mate", self.cx_one_point)
+        self.toolbox.register("batchMutate", self.batch_mutate, indpb=1.0 / self.n_sudoku.size)
 
     # Genetic operators:
     # Create random sudoku with given fixed numbers as individuals for initial population
     def random_sudoku(self):
-        new_sudoku = [random.randint(0, i) for i in self.n_sudoku.possibility_range]
-        return new_sudoku
+        new_sudoku = self.np_rng.integers(0, self.upper_bounds, dtype=np.intc)
+        return new_sudoku.tolist()
+
+    # One point crossover as tools.cxOnePoint, but drawing from the solver's own random generator:
+    def cx_one_point(self, ind1, ind2):
+        cxpoint = self.rng.randint(1, min(len(ind1), len(ind2)) - 1)
+        ind1[cxpoint:], ind2[cxpoint:] = ind2[cxpoint:], ind1[cxpoint:]
+        return ind1, ind2
+
+    # Vectorized tournament selection, same semantics as tools.selTournament: k tournaments between
+    # tournsize randomly drawn individuals (with replacement), each won by the best weighted fitness:
+    def vec_tournament(self, individuals, k, tournsize):
+        fitnesses = np.fromiter((ind.fitness.wvalues[0] for ind in individuals), dtype=np.float64,
+                                count=len(individuals))
+        aspirants = self.np_rng.integers(0, len(individuals), size=(k, tournsize))
+        winners = aspirants[np.arange(k), fitnesses[aspirants].argmax(axis=1)]
+        return [individuals[i] for i in winners.tolist()]
+
+    # Uniform integer mutation for the whole offspring at once: each individual is a mutant with probability mutpb,
+    # each gene of a mutant is replaced by a random valid index with probability indpb.
+    # Fitness values are left untouched, the returned boolean mask marks the individuals with replaced genes:
+    def batch_mutate(self, offspring, mutpb, indpb):
+        count = len(offspring)
+        mutants = self.np_rng.random(count) < mutpb
+        mask = (self.np_rng.random((count, self.n_sudoku.size)) < indpb) & mutants[:, None]
+        rows, cols = np.nonzero(mask)
+        values = self.np_rng.integers(0, self.upper_bounds[cols], dtype=np.intc)
+        for i, j, value in zip(rows.tolist(), cols.tolist(), values.tolist()):
+            offspring[i][j] = value
+        return mask.any(axis=1)
 
     # fitness calculation - get the number of row or square violations for a given option:
     def get_violations_count(self, individual):
-        violations = self.n_sudoku.get_position_violation_count(individual)
+        key = bytes(individual)
+        violations = self._fit_cache.get(key)
+        if violations is None:
+            violations = self.n_sudoku.get_position_violation_count(individual)
+            self.cache_fitness(key, violations)
         return violations,  # evaluate expects a tuple
 
-    # Precise definition of equality of two arrays for hall of fame algorithm
+    # batched fitness calculation - replaces toolbox.map, func is ignored and the whole batch is evaluated at once.
+    # Individuals already seen before are answered from the fitness cache, only the rest is evaluated:
+    def batched_map(self, func, individuals):
+        keys = [bytes(ind) for ind in individuals]
+        values = {key: self._fit_cache[key] for key in keys if key in self._fit_cache}
+        uncached = [key for key in dict.fromkeys(keys) if key not in values]
+        if uncached:
+            solutions = np.frombuffer(b''.join(uncached), dtype=np.intc).reshape(len(uncached), self.n_sudoku.size)
+            if self.device is not None:
+                violations = self.n_sudoku.get_position_violation_count_torch(solutions, self.device)
+            else:
+                violations = self.n_sudoku.get_position_violation_count_batch(solutions)
+            for key, value in zip(uncached, violations.tolist()):
+                values[key] = value
+                self.cache_fitness(key, value)
+        return [(values[key],) for key in keys]
+
+    def cache_fitness(self, key, violations):
+        if len(self._fit_cache) < FITNESS_CACHE_SIZE:
+            self._fit_cache[key] = violations
+
+    # Precise definition of equality of two individuals for hall of fame algorithm,
+    # plain sequence comparison avoids building numpy arrays for every pair
     @staticmethod
-    def np_equal(a, b):
-        return np.all(a == b)
+    def seq_equal(a, b):
+        return a == b
 
     @staticmethod
     def print_solution_stream(stream):
@@ -102,25 +182,24 @@ class GASolver:
         new_population = self.toolbox.populationCreator(n=self.population_size)
 
         # prepare the statistics object:
-        stats = tools.Statistics(lambda ind: ind.fitness.values)
-        stats.register("min", np.min)
-        stats.register("avg", np.mean)
+        stats = FitnessStatistics()
 
         # define the hall-of-fame object:
-        hof = tools.HallOfFame(self.hall_of_fame_size, similar=self.np_equal)
+        hof = tools.HallOfFame(self.hall_of_fame_size, similar=self.seq_equal)
 
         # perform the Genetic Algorithm flow with hof feature added:
         new_population, logbook = elitism.eaSimpleWithElitism(
-            new_population, 
-            self.toolbox, 
+            new_population,
+            self.toolbox,
             cxpb=self.p_crossover,
-            mutpb=self.p_mutation, 
+            mutpb=self.p_mutation,
             ngen=self.max_generations,
-            stats=stats, 
+            stats=stats,
             halloffame=hof,
             status_callback=self.status_callback,
             stuck=(self.stuck_count, self.shock_event),
-            verbosity = self.verbosity
+            verbosity = self.verbosity,
+            rng=self.rng
         )
 
         self.solution = self.n_sudoku.get_solution(hof.items[0])
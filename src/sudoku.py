@@ -3,6 +3,46 @@ from itertools import product
 from functools import reduce
 import random
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional, fall back to plain NumPy
+    njit = None
+
+
+# flat cell indices of the 9 columns and the 9 3x3 sectors of a 9x9 board
+_GROUP_INDEX = np.concatenate((
+    np.arange(81, dtype=np.int8).reshape(9, 9).T,
+    np.arange(81, dtype=np.int8).reshape(3, 3, 3, 3).transpose(0, 2, 1, 3).reshape(9, 9)
+))
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True, boundscheck=False)
+    def _count_violations(solutions, possibility_table):
+        """
+        Counts the column and 3x3 sector violations for a batch of solutions.
+        Specialized to the fixed 9x9 shape: the 18 groups of 9 cells come from the constant _GROUP_INDEX,
+        cells are read straight from the possibility table and repetitions are found with a bit mask.
+        :param solutions: integer array of shape N, 9 containing one row index per sudoku row for each solution.
+        :param possibility_table: int8 array of shape 9, options, 9 with the valid rows per sudoku row.
+        :return: np.array of shape N with the calculated values
+        """
+        n = solutions.shape[0]
+        violations = np.zeros(n, dtype=np.int32)
+        for p in prange(n):
+            total = 0
+            for g in range(18):
+                seen = 0
+                for k in range(9):
+                    cell = _GROUP_INDEX[g, k]
+                    row = cell // 9
+                    bit = 1 << possibility_table[row, solutions[p, row], cell - 9 * row]
+                    if seen & bit:
+                        total += 1
+                    seen |= bit
+            violations[p] = total
+        return violations
+
 
 class SudokuProblem:
     """This class encapsulates the Sudoku Problem
@@ -16,6 +56,14 @@ class SudokuProblem:
         self.size = self.sudoku.shape[0]
         self.possibilities = possibilities
         self.possibility_map, self.possibility_range = self.build_map()
+        # one (options, 9) digit table per row, used to map whole populations at once
+        self.possibility_arrays = [np.array(rows, dtype=np.int8) for rows in self.possibility_map]
+        # the same tables zero-padded into one array of shape 9, options, 9 for the compiled kernel
+        self.possibility_table = np.zeros((self.size, max(self.possibility_range) + 1, 9), dtype=np.int8)
+        for i, rows in enumerate(self.possibility_arrays):
+            self.possibility_table[i, :len(rows)] = rows
+        # the same tables as torch tensors, created on first use per device
+        self.device_tables = dict()
 
     def build_map(self):
         """
@@ -71,6 +119,66 @@ class SudokuProblem:
 
         return violations
 
+    def get_position_violation_count_batch(self, solutions):
+        """
+        Calculates the number of violations for a whole batch of solutions in one go.
+        Counts the same column and 3x3 sector violations as get_position_violation_count.
+        :param solutions: integer array of shape N, 9 containing one row index per sudoku row for each solution.
+        :return: np.array of shape N with the calculated values
+        """
+        if njit is not None:
+            return _count_violations(np.asarray(solutions), self.possibility_table)
+        return self.get_position_violation_count_numpy(solutions)
+
+    def get_position_violation_count_numpy(self, solutions):
+        """
+        Plain NumPy version of get_position_violation_count_batch, used when numba is not available.
+        :param solutions: integer array of shape N, 9 containing one row index per sudoku row for each solution.
+        :return: np.array of shape N with the calculated values
+        """
+        solutions = np.asarray(solutions)
+        n = solutions.shape[0]
+
+        # fill empty sudoku cells with solutions, shape N, 9, 9
+        mapped = np.stack([self.possibility_arrays[i][solutions[:, i]] for i in range(self.size)], axis=1)
+
+        # gather columns and 3x3 sectors as groups of 9 cells each
+        groups = np.sort(mapped.reshape(n, 81)[:, _GROUP_INDEX], axis=2)
+
+        # each repeated number within a group is one violation
+        return (groups[:, :, 1:] == groups[:, :, :-1]).sum(axis=(1, 2))
+
+    def get_position_violation_count_torch(self, solutions, device):
+        """
+        Calculates the number of violations for a whole batch of solutions on a torch device (e.g. 'cuda:0').
+        Counts the same violations as get_position_violation_count_batch, using one-hot histograms per group.
+        :param solutions: integer array of shape N, 9 containing one row index per sudoku row for each solution.
+        :param device: torch device to run the calculation on.
+        :return: np.array of shape N with the calculated values
+        """
+        try:
+            import torch  # optional, imported here to keep module import cheap
+        except ImportError as err:
+            raise ImportError("torch is required to evaluate solutions on a torch device") from err
+
+        device = torch.device(device)
+        if device not in self.device_tables:
+            self.device_tables[device] = (
+                [torch.as_tensor(rows, dtype=torch.long, device=device) for rows in self.possibility_arrays],
+                torch.as_tensor(_GROUP_INDEX, dtype=torch.long, device=device)
+            )
+        row_tables, group_index = self.device_tables[device]
+
+        solutions = torch.as_tensor(np.asarray(solutions, dtype=np.int64), device=device)
+        n = solutions.shape[0]
+
+        # fill empty sudoku cells with solutions, shape N, 81
+        mapped = torch.stack([row_tables[i][solutions[:, i]] for i in range(self.size)], dim=1).reshape(n, 81)
+
+        # count each number per column and 3x3 sector, every repetition is one violation
+        histogram = torch.nn.functional.one_hot(mapped[:, group_index], num_classes=10).sum(dim=2)
+        return (histogram - 1).clamp(min=0).sum(dim=(1, 2)).cpu().numpy()
+
     def plot_solution(self, solution):
         """
         Plots a zero-based sudoku solution in the final one-based format
@@ -134,6 +242,21 @@ def main():
     print(solution)
     print(sudoku_problem.get_solution(solution))
 
+    # check that all batch counters agree with the scalar counter on random solutions
+    rng = np.random.default_rng(42)
+    solutions = rng.integers(0, np.asarray(sudoku_range) + 1, size=(2000, sudoku_problem.size))
+    expected = [sudoku_problem.get_position_violation_count(solution) for solution in solutions]
+    counters = {'numpy': sudoku_problem.get_position_violation_count_numpy}
+    if njit is not None:
+        counters['numba'] = sudoku_problem.get_position_violation_count_batch
+    try:
+        import torch  # noqa: F401
+        counters['torch'] = lambda batch: sudoku_problem.get_position_violation_count_torch(batch, 'cpu')
+    except ImportError:
+        pass
+    for name, counter in counters.items():
+        print(name, 'counter agrees:', np.array_equal(counter(solutions), expected))
+
 if __name__ == "__main__":
     main()
 